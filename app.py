@@ -3,21 +3,22 @@
 
 import streamlit as st
 import json
-from collections import defaultdict
-from pathlib import Path
 from datetime import datetime
 
 from spanish_core import (
-    load_jehle_db, load_overrides, save_overrides,
-    load_frequency_map, sorted_infinitives, search_verbs,
-    get_verb_record, merge_usage, load_templates, render_prompt,
+    load_jehle_db, load_overrides,
+    load_frequency_map, get_db_indexes, DbIndexes, search_verbs,
+    get_overrides_version, get_merged_verb, load_templates, render_prompt, build_verb_context, VerbContext,
     get_taxonomy_map,
     # Browser storage functions
     init_user_data_in_session, toggle_favourite, is_favourite,
-    export_user_data_json, import_user_data_from_json, merge_favourites
+    get_favourites_set, clear_favourites, export_user_data_json, import_user_data_from_json, merge_favourites
+)
+from spanish_state import PAGE_CONFIG, ensure_state, click_tile, open_detail, back_to_grid
+from spanish_ui import (
+    apply_styles, build_verb_card_html, render_tile_grid,
+    render_conjugation_dashboard, build_conjugation_tables,
 )
-from spanish_state import PAGE_CONFIG, ensure_state, click_tile, back_to_grid
-from spanish_ui import apply_styles, build_verb_card_html
 
 DB_JSON = "jehle_verb_database.json"
 LOOKUP_JSON = "jehle_verb_lookup_index.json"
@@ -31,23 +32,105 @@ ensure_state()
 
 verbs, lookup = load_jehle_db(DB_JSON, LOOKUP_JSON)
 rank_map = load_frequency_map(FREQ_JSON)
-overrides = load_overrides(OVERRIDES_JSON)
-templates_map = load_templates(VERBS_CAT_JSON)
+overrides_version = get_overrides_version(OVERRIDES_JSON)
+overrides = load_overrides(OVERRIDES_JSON, overrides_version)
+templates_map, guide_content = load_templates(VERBS_CAT_JSON)
+verb_ctx = build_verb_context(VERBS_CAT_JSON)
+db_indexes = get_db_indexes(DB_JSON, LOOKUP_JSON, FREQ_JSON)
+lower_map = db_indexes.lower_map
+
+def get_rank(inf: str) -> int | None:
+    """Frequency rank via the cached lowercase map (rank_map keys are lowercased at load)."""
+    low = lower_map.get(inf)
+    return rank_map.get(low if low is not None else inf.lower())
 
 # Initialize user data in session (browser-based)
 user_data = init_user_data_in_session()
 
-# --- Helper to load Guide from the Main JSON ---
-@st.cache_data
-def load_guide_content(path: str):
-    p = Path(path)
-    if not p.exists():
-        return None
-    with open(p, "r", encoding="utf-8") as f:
-        data = json.load(f)
-        return data.get("reference_guide")
+# --- Cached grid list (reused across reruns until query/sort changes) ---
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_search(q: str, limit: int, _verbs: list, _indexes: DbIndexes) -> tuple[str, ...]:
+    return tuple(r["infinitive"] for r in search_verbs(_verbs, q, limit=limit, indexes=_indexes) if r.get("infinitive"))
+
+@st.cache_data(show_spinner=False)
+def build_list(search_query: str, sort_mode: str, _verbs: list, _indexes: DbIndexes) -> list[str]:
+    """Infinitives for the grid; sort_mode is "popularity" or "alphabetical"."""
+    searching = bool(search_query)
+    if sort_mode == "popularity" and not searching:
+        # Rank order is static: reuse the list sorted once at load
+        return list(_indexes.popularity)
+    # load_jehle_db guarantees unique infinitives and search_verbs yields each record at most once,
+    # so neither branch needs a dedup pass
+    base = _cached_search(search_query, 5000, _verbs, _indexes) if searching else _indexes.infinitives
+    if sort_mode == "popularity":
+        hits = set(base)
+        return [inf for inf in _indexes.popularity if inf in hits]
+    return sorted(base, key=_indexes.lower_map.__getitem__)
+
+@st.cache_data(show_spinner=False)
+def bucket_by_ending(search_query: str, _base_list: list[str], _ending_map: dict, _lower_map: dict) -> dict[str, list[str]]:
+    """
+    Split the (alphabetical) list for search_query into ar/er/ir/other, each bucket sorted once.
+    Keyed on the query alone, so the full-DB partition is built once per process.
+    """
+    buckets = {"ar": [], "er": [], "ir": [], "other": []}
+    for inf in _base_list:
+        buckets[_ending_map[inf]].append(inf)
+    for key in buckets:
+        buckets[key].sort(key=_lower_map.__getitem__)
+    return buckets
+
+@st.cache_data(show_spinner=False)
+def group_by_taxonomy(search_query: str, _base_list: list[str], _taxonomy_map: dict, _lower_map: dict) -> tuple[dict, list[str]]:
+    """
+    Group the (alphabetical) list for search_query as {root: {sub: [infs]}} plus the uncategorised rest,
+    pre-sorted for rendering. Keyed on the query alone, like bucket_by_ending.
+    """
+    grouped: dict[str, dict[str, list[str]]] = {}
+    standard = []
+    for inf in _base_list:
+        meta = _taxonomy_map.get(_lower_map[inf])
+        if meta:
+            grouped.setdefault(meta['root'], {}).setdefault(meta['sub'], []).append(inf)
+        else:
+            standard.append(inf)
+    grouped_sorted = {
+        root: {sub: sorted(sub_groups[sub]) for sub in sorted(sub_groups.keys())}
+        for root, sub_groups in grouped.items()
+    }
+    return grouped_sorted, standard
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_conjugation_tables(inf: str, overrides_version: int, show_vos: bool, show_vosotros: bool,
+                              _verbs: list, _lookup: dict, _overrides: dict, _ctx: VerbContext) -> list:
+    """Dashboard tables per (verb, display flags), so tab switches don't rebuild every DataFrame."""
+    v = get_merged_verb(inf, _verbs, _lookup, _overrides, _ctx)
+    return build_conjugation_tables(v, show_vos, show_vosotros) if v else []
+
+# --- Favourites callbacks (run before the rerun, so each click costs one rerun) ---
+def _clear_all_favourites() -> None:
+    clear_favourites()
+    st.toast("All favourites cleared!", icon="🗑️")
+
+def _replace_favourites(json_str: str) -> None:
+    if import_user_data_from_json(json_str):
+        st.toast("Favourites imported!", icon="✅")
+    else:
+        st.toast("Invalid JSON file", icon="❌")
+
+def _merge_favourites(json_str: str) -> None:
+    try:
+        data = json.loads(json_str)
+        merge_favourites(data.get("favourites", []))
+        st.toast("Favourites merged!", icon="✅")
+    except Exception:
+        st.toast("Invalid JSON file", icon="❌")
 
-guide_content = load_guide_content(VERBS_CAT_JSON)
+def _apply_search() -> None:
+    st.session_state["search_query"] = st.session_state.get("search_input", "").strip()
+
+def _clear_search() -> None:
+    st.session_state["search_query"] = ""
 
 # Fetch state vars
 mode = st.session_state.get("mode", "grid")
@@ -68,17 +151,13 @@ with st.sidebar:
 
     if mode == "grid":
         if preview_inf:
-            if st.button(f"Open '{preview_inf}' Details ➡", use_container_width=True, type="primary"):
-                st.session_state["selected"] = preview_inf
-                st.session_state["mode"] = "detail"
-                st.rerun()
+            st.button(f"Open '{preview_inf}' Details ➡", use_container_width=True, type="primary",
+                      on_click=open_detail, args=(preview_inf,))
         else:
             st.button("Select a verb to preview...", disabled=True, use_container_width=True)
             
     elif mode == "detail":
-        if st.button("⬅ Back to Verb Grid", use_container_width=True, type="primary"):
-            back_to_grid()
-            st.rerun()
+        st.button("⬅ Back to Verb Grid", use_container_width=True, type="primary", on_click=back_to_grid)
 
     st.divider()
 
@@ -100,18 +179,10 @@ with st.sidebar:
             help="Download your favourites as JSON to save permanently"
         )
         
-        # Clear all favourites
-        if st.button("🗑️ Clear All Favourites", use_container_width=True, type="secondary"):
-            if st.session_state.get("confirm_clear"):
-                user_data["favourites"] = []
-                st.session_state["user_data"] = user_data
-                st.session_state["confirm_clear"] = False
-                st.toast("All favourites cleared!", icon="🗑️")
-                st.rerun()
-            else:
-                st.session_state["confirm_clear"] = True
-                st.warning("⚠️ Click again to confirm")
-                st.rerun()
+        # Clear all favourites (confirm inside the popover -> a single rerun)
+        with st.popover("🗑️ Clear All Favourites", use_container_width=True):
+            st.caption(f"Remove all {fav_count} favourite{'s' if fav_count != 1 else ''} from this session?")
+            st.button("Yes, clear all", type="primary", use_container_width=True, on_click=_clear_all_favourites)
     else:
         st.caption("No favourites yet")
     
@@ -130,25 +201,11 @@ with st.sidebar:
                 json_str = uploaded_file.read().decode("utf-8")
                 
                 col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("Replace", use_container_width=True, help="Replace all current favourites"):
-                        if import_user_data_from_json(json_str):
-                            st.success("✅ Favourites imported!")
-                            st.rerun()
-                        else:
-                            st.error("❌ Invalid JSON file")
-                
-                with col2:
-                    if st.button("Merge", use_container_width=True, help="Add to existing favourites"):
-                        try:
-                            data = json.loads(json_str)
-                            new_favs = data.get("favourites", [])
-                            merge_favourites(new_favs)
-                            st.success("✅ Favourites merged!")
-                            st.rerun()
-                        except:
-                            st.error("❌ Invalid JSON file")
-                            
+                col1.button("Replace", use_container_width=True, help="Replace all current favourites",
+                            on_click=_replace_favourites, args=(json_str,))
+                col2.button("Merge", use_container_width=True, help="Add to existing favourites",
+                            on_click=_merge_favourites, args=(json_str,))
+
             except Exception as e:
                 st.error(f"Error reading file: {e}")
     
@@ -157,39 +214,30 @@ with st.sidebar:
     st.subheader("Search")
     if "search_query" not in st.session_state:
         st.session_state["search_query"] = ""
-    if "search_input" not in st.session_state:
-        st.session_state["search_input"] = ""
-
-    search_cols = st.columns([0.85, 0.15])
-    with search_cols[0]:
-        search_text = st.text_input(
-            "Search",
-            value=st.session_state["search_input"],
-            placeholder="hablar / speak",
-            label_visibility="collapsed",
-        )
-    with search_cols[1]:
-        if st.button("🔍", help="Search", use_container_width=True):
-            st.session_state["search_query"] = search_text.strip()
-            st.session_state["search_input"] = ""
-            st.rerun()
-
-    st.session_state["search_input"] = search_text
 
-    if st.button("Clear search", use_container_width=True):
-        st.session_state["search_query"] = ""
-        st.rerun()
+    # Inside a form, typing never reruns the script; only 🔍 / Enter submits
+    with st.form("search_form", clear_on_submit=True, border=False):
+        search_cols = st.columns([0.85, 0.15])
+        with search_cols[0]:
+            st.text_input(
+                "Search",
+                key="search_input",
+                placeholder="hablar / speak",
+                label_visibility="collapsed",
+            )
+        with search_cols[1]:
+            st.form_submit_button("🔍", help="Search", use_container_width=True, on_click=_apply_search)
+
+    st.button("Clear search", use_container_width=True, on_click=_clear_search)
 
     st.divider()
 
     if mode == "grid":
         st.subheader("Preview")
         if preview_inf:
-            v = get_verb_record(verbs, lookup, preview_inf)
+            v = get_merged_verb(preview_inf, verbs, lookup, overrides, verb_ctx)
             if v:
-                v = merge_usage(v, overrides)
-                rank = rank_map.get(preview_inf.lower())
-                st.markdown(build_verb_card_html(v, rating=None, freq_rank=rank), unsafe_allow_html=True)
+                st.markdown(build_verb_card_html(v, rating=None, freq_rank=get_rank(preview_inf)), unsafe_allow_html=True)
                 
                 # ⭐ FAVOURITE TOGGLE IN PREVIEW
                 is_fav = is_favourite(preview_inf)
@@ -214,63 +262,72 @@ with st.sidebar:
 # 🛠️ MAIN AREA
 # ==========================================
 
-if mode == "grid":
+# Internal view keys -> radio labels; branches below compare against the keys only
+SORT_OPTIONS = {
+    "alphabetical": "Alphabetical",
+    "ending": "ar/er/ir/se",
+    "category": "By Category",
+    "popularity": "Popularity",
+    "favourites": "⭐ Favourites",
+}
+
+@st.fragment
+def render_grid() -> None:
+    """Grid view. Runs as a fragment: sort/page changes rerun only this block, not the sidebar."""
     st.info("💡 **Tip:** Click a tile to **preview** in the sidebar. Click the **same tile again** (or the sidebar button) to open details.", icon="ℹ️")
 
     sort_option = st.radio(
         "Sort Order",
-        options=["Alphabetical", "ar/er/ir/se", "By Category", "Popularity", "⭐ Favourites"], 
-        index=0, 
+        options=list(SORT_OPTIONS),
+        format_func=SORT_OPTIONS.get,
+        key="sort_option",
         horizontal=True,
         label_visibility="collapsed"
     )
 
-    def _rank(inf: str) -> int:
-        return rank_map.get(inf.lower(), 10_000_000)
-
-    def build_list() -> list[str]:
-        q = st.session_state.get("search_query", "")
-        if q.strip():
-            results = search_verbs(verbs, q, limit=5000)
-            base = [r["infinitive"] for r in results if r.get("infinitive")]
-        else:
-            base = [v["infinitive"] for v in verbs if v.get("infinitive")]
-        base = list(dict.fromkeys(base))
-        if sort_option == "Popularity":
-            base.sort(key=lambda inf: (_rank(inf), inf))
-            return base
-        return sorted(base, key=lambda x: x.lower())
-
-    base_list = build_list()
-
-    def render_tiles(infs: list[str], per_row: int = 6, max_items: int = 240):
-        """Render verb tiles with ⭐ indicator for favourites"""
-        infs = infs[:max_items]
-        for i in range(0, len(infs), per_row):
-            row = infs[i:i+per_row]
-            cols = st.columns(per_row)
-            for j, inf in enumerate(row):
-                # Add ⭐ to favourites
-                is_fav = is_favourite(inf)
-                label = f"⭐ {inf}" if is_fav else inf
-                
-                is_preview = (st.session_state.get("preview") == inf)
-                btn_type = "primary" if is_preview else "secondary"
-                cols[j].button(
-                    label,
-                    key=f"tile_{inf}",
-                    use_container_width=True,
-                    type=btn_type,
-                    on_click=click_tile,
-                    args=(inf,),
-                )
+    # Every view except Popularity shares the alphabetical list, so they share one cache entry
+    sort_mode = "popularity" if sort_option == "popularity" else "alphabetical"
+    # search_verbs is case-insensitive, so normalize here and let "Hablar"/"hablar" share cache entries
+    search_query = st.session_state.get("search_query", "").strip().lower()
+    base_list = build_list(search_query, sort_mode, verbs, db_indexes)
+
+    # Tile pages are tracked per grid section and reset whenever the search or sort changes
+    grid_pages = st.session_state.setdefault("grid_page", {})
+    page_ctx = (st.session_state.get("search_query", ""), sort_option)
+    if st.session_state.get("grid_page_ctx") != page_ctx:
+        st.session_state["grid_page_ctx"] = page_ctx
+        grid_pages.clear()
+
+    # Only favourites get a decorated label, so build those once per run and default to the bare infinitive
+    fav_labels = {inf: f"⭐ {inf}" for inf in get_favourites_set()}
+
+    def _set_page(key: str, page: int) -> None:
+        st.session_state["grid_page"][key] = page
+
+    def render_tiles(infs: list[str], key: str, per_row: int = 6, page_size: int = 60):
+        """Render one page of verb tiles with ⭐ indicator for favourites"""
+        n_pages = max(1, -(-len(infs) // page_size))
+        page = min(grid_pages.get(key, 0), n_pages - 1)
+        if n_pages > 1:
+            prev_col, info_col, next_col = st.columns([0.2, 0.6, 0.2])
+            prev_col.button("◀ Prev", key=f"{key}_prev", disabled=page == 0, use_container_width=True,
+                            on_click=_set_page, args=(key, page - 1))
+            info_col.caption(f"Page {page + 1} of {n_pages} · {len(infs)} verbs")
+            next_col.button("Next ▶", key=f"{key}_next", disabled=page == n_pages - 1, use_container_width=True,
+                            on_click=_set_page, args=(key, page + 1))
+        tiles = [(inf, fav_labels.get(inf, inf)) for inf in infs[page * page_size:(page + 1) * page_size]]
+        clicked = render_tile_grid(tiles, selected=st.session_state.get("preview"), key=key, per_row=per_row)
+        if clicked:
+            click_tile(clicked)
+            st.rerun()  # whole app, so the sidebar preview follows the click
 
     # ⭐ FAVOURITES VIEW
-    if sort_option == "⭐ Favourites":
-        favourites = user_data.get("favourites", [])
+    if sort_option == "favourites":
+        favourites = st.session_state["user_data"].get("favourites", [])
         if favourites:
             # Filter to only favourites that exist in current search/base list
-            fav_verbs = [inf for inf in favourites if inf in base_list]
+            base_set = set(base_list)
+            fav_verbs = [inf for inf in favourites if inf in base_set]
             
             if fav_verbs:
                 st.subheader(f"⭐ Your Favourites ({len(fav_verbs)} verb{'s' if len(fav_verbs) != 1 else ''})")
@@ -278,11 +335,11 @@ if mode == "grid":
                 # Show tip with download reminder
                 st.info("💡 **Tip:** Download your favourites using the sidebar button to save them permanently!", icon="💾")
                 
-                render_tiles(fav_verbs, max_items=600)
+                render_tiles(fav_verbs, key="tiles_favourites")
                 
                 # Show removed favourites if search is active
                 if st.session_state.get("search_query", "").strip():
-                    removed = [inf for inf in favourites if inf not in base_list]
+                    removed = [inf for inf in favourites if inf not in base_set]
                     if removed:
                         with st.expander(f"🔍 {len(removed)} favourite{'s' if len(removed) != 1 else ''} hidden by search"):
                             st.caption(", ".join(removed))
@@ -291,36 +348,25 @@ if mode == "grid":
         else:
             st.info("⭐ **You haven't added any favourites yet!**\n\n**To add favourites:**\n1. Click a verb tile to preview it\n2. Click the '☆ Add to Favourites' button in the sidebar\n\n**To save permanently:**\n- Use the '📥 Download Favourites' button in the sidebar\n- Save the JSON file to your computer or GitHub\n- Upload it later using '📤 Upload Favourites'", icon="💡")
 
-    elif sort_option == "ar/er/ir/se":
-        ar = sorted([inf for inf in base_list if inf.lower().endswith("ar")], key=lambda x: x.lower())
-        er = sorted([inf for inf in base_list if inf.lower().endswith("er")], key=lambda x: x.lower())
-        ir = sorted([inf for inf in base_list if inf.lower().endswith(("ir", "ír"))], key=lambda x: x.lower())
-        other = sorted([inf for inf in base_list if not inf.lower().endswith(("ar", "er", "ir", "ír"))], key=lambda x: x.lower())
+    elif sort_option == "ending":
+        buckets = bucket_by_ending(search_query, base_list, db_indexes.endings, lower_map)
+        ar, er, ir, other = buckets["ar"], buckets["er"], buckets["ir"], buckets["other"]
 
         st.subheader("-ar verbs")
-        render_tiles(ar)
+        render_tiles(ar, key="tiles_ar")
         st.divider()
         st.subheader("-er verbs")
-        render_tiles(er)
+        render_tiles(er, key="tiles_er")
         st.divider()
         st.subheader("-ir verbs")
-        render_tiles(ir)
+        render_tiles(ir, key="tiles_ir")
         if other:
             st.divider()
             st.subheader("Other")
-            render_tiles(other)
+            render_tiles(other, key="tiles_other")
 
-    elif sort_option == "By Category":
-        taxonomy_map = get_taxonomy_map()
-        grouped = defaultdict(lambda: defaultdict(list))
-        standard = []
-        
-        for inf in base_list:
-            meta = taxonomy_map.get(inf.lower())
-            if meta:
-                grouped[meta['root']][meta['sub']].append(inf)
-            else:
-                standard.append(inf)
+    elif sort_option == "category":
+        grouped, standard = group_by_taxonomy(search_query, base_list, get_taxonomy_map(), lower_map)
         
         root_order = [
             "🧠 Experiencer (Gustar-like)",
@@ -328,44 +374,38 @@ if mode == "grid":
             "🪞 Reflexive (Self-directed)",
             "🔄 Pronominal (Meaning Shift)"
         ]
-        
-        for root in root_order:
-            if root in grouped:
-                st.header(root)
-                sub_groups = grouped[root]
-                for sub in sorted(sub_groups.keys()):
-                    st.markdown(f"#### {sub}")
-                    render_tiles(sorted(sub_groups[sub]))
-                st.divider()
-                del grouped[root]
-        
-        for root, sub_groups in grouped.items():
+        # Known roots first (in display order), then any others; grouped is never mutated
+        known = [root for root in root_order if root in grouped]
+        rest = [root for root in grouped if root not in root_order]
+
+        for root in known + rest:
             st.header(root)
-            for sub in sorted(sub_groups.keys()):
+            for sub, sub_infs in grouped[root].items():
                 st.markdown(f"#### {sub}")
-                render_tiles(sorted(sub_groups[sub]))
+                render_tiles(sub_infs, key=f"tiles_{root}_{sub}")
             st.divider()
             
         if standard:
             st.header("Standard / Other")
-            render_tiles(standard)
+            render_tiles(standard, key="tiles_standard")
 
     else:
         # Alphabetical or Popularity
-        render_tiles(base_list, max_items=600)
+        render_tiles(base_list, key="tiles_all")
 
+
+if mode == "grid":
+    render_grid()
 else:
     # --- DETAIL VIEW ---
     if not selected_inf:
         st.warning("No verb selected.")
         st.stop()
 
-    v = get_verb_record(verbs, lookup, selected_inf)
+    v = get_merged_verb(selected_inf, verbs, lookup, overrides, verb_ctx)
     if not v:
         st.error("Verb not found.")
         st.stop()
-
-    v = merge_usage(v, overrides)
     
     # ⭐ HEADER WITH FAVOURITE TOGGLE
     col1, col2 = st.columns([0.88, 0.12])
@@ -385,8 +425,9 @@ else:
     tabs = st.tabs(["Conjugations", "Prompt generator", "📘 Guide"])
     
     with tabs[0]:
-        from spanish_ui import render_conjugation_dashboard
-        render_conjugation_dashboard(v, show_vos=show_vos, show_vosotros=show_vosotros)
+        tables = cached_conjugation_tables(selected_inf, overrides_version, show_vos, show_vosotros,
+                                           verbs, lookup, overrides, verb_ctx)
+        render_conjugation_dashboard(v, show_vos=show_vos, show_vosotros=show_vosotros, tables=tables)
 
     with tabs[1]:
         template_id = st.selectbox(
@@ -394,7 +435,7 @@ else:
             options=list(templates_map.keys()),
             format_func=lambda k: f"{templates_map[k]['name']} ({k})"
         )
-        prompt = render_prompt(template_id, v)
+        prompt = render_prompt(template_id, v, verb_ctx)
         st.subheader("Generated AI Prompt")
         st.code(prompt, language="text")
 
@@ -5,20 +5,70 @@
 from __future__ import annotations
 
 import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, replace
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from string import Formatter
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
 from datetime import datetime
+import numpy as np
 import streamlit as st
 
+try:
+    import orjson
+except ImportError:  # in requirements.txt for faster cold-start parsing; stdlib json otherwise
+    orjson = None
+
 VERBS_CAT_JSON = "verbs_categorized.json"
 
-@st.cache_data(show_spinner=False)
+
+def _loads(data: str | bytes) -> Any:
+    """json.loads, via orjson when it is installed (both raise a json.JSONDecodeError subclass)."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dumps(obj: Any, compact: bool = True) -> str:
+    """JSON text with non-ASCII kept as-is; compact by default, indent=2 when compact=False."""
+    if not compact:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _read_json(path) -> Any:
+    """Parse a UTF-8 JSON file straight from its bytes, skipping the separate text-decode step."""
+    return _loads(Path(path).read_bytes())
+
+
+@st.cache_resource(show_spinner=False)
 def load_jehle_db(db_json_path: str, lookup_json_path: str) -> Tuple[List[dict], Dict[str, int]]:
-    with open(db_json_path, "r", encoding="utf-8") as f:
-        verbs = json.load(f)
-    with open(lookup_json_path, "r", encoding="utf-8") as f:
-        lookup = json.load(f)
+    verbs = _read_json(db_json_path)
+    lookup = _read_json(lookup_json_path)
     lookup = {k.lower(): int(v) for k, v in lookup.items()}
+
+    # Infinitives are unique per record; enforce it here so callers can skip dedup.
+    # Records without an infinitive are all kept. Each record also gets its lowercased
+    # infinitive ("_inf_lc") so hot paths never call .lower().
+    first_pos: Dict[str, int] = {}
+    new_pos = []
+    unique = []
+    for v in verbs:
+        inf = v.get("infinitive")
+        if inf and inf in first_pos:
+            new_pos.append(first_pos[inf])
+            continue
+        if inf:
+            first_pos[inf] = len(unique)
+        new_pos.append(len(unique))
+        v["_inf_lc"] = (inf or "").lower()
+        unique.append(v)
+    if len(unique) != len(verbs):
+        # Remap the existing entries (aliases included) rather than rebuilding the lookup;
+        # an entry for a dropped duplicate now points at the record that was kept
+        verbs = unique
+        lookup = {k: new_pos[i] for k, i in lookup.items() if 0 <= i < len(new_pos)}
     return verbs, lookup
 
 @st.cache_data(show_spinner=False)
@@ -26,143 +76,181 @@ def load_se_catalog(path: str = VERBS_CAT_JSON) -> dict:
     p = Path(path)
     if not p.exists():
         return {}
-    return json.loads(p.read_text(encoding="utf-8"))
+    return _read_json(p)
 
-@st.cache_data(show_spinner=False)
-def get_taxonomy_map(json_path: str = VERBS_CAT_JSON) -> Dict[str, Dict[str, str]]:
-    data = load_se_catalog(json_path)
-    taxonomy = data.get("verb_taxonomy", {})
-    mapping = {}
+_ROOT_NAMES = {
+    "reflexive": "🪞 Reflexive (Self-directed)",
+    "pronominal": "🔄 Pronominal (Meaning Shift)",
+    "accidental_dative": "💥 Accidental Se (Se me...)",
+    "experiencer": "🧠 Experiencer (Gustar-like)"
+}
 
-    root_names = {
-        "reflexive": "🪞 Reflexive (Self-directed)",
-        "pronominal": "🔄 Pronominal (Meaning Shift)",
-        "accidental_dative": "💥 Accidental Se (Se me...)",
-        "experiencer": "🧠 Experiencer (Gustar-like)"
-    }
 
+def _iter_taxonomy_pairs(taxonomy: dict):
+    """Yield (lowercased base or pronominal form, {"root", "sub"}) for every verb in the taxonomy."""
     for root_key, root_data in taxonomy.items():
-        root_label = root_names.get(root_key, root_key.title())
-        categories = root_data.get("categories", {})
-        
-        for sub_key, sub_data in categories.items():
-            sub_label = sub_key.replace("_", " ").title()
-            verbs_dict = sub_data.get("verbs", {})
-            for base, val in verbs_dict.items():
+        root_label = _ROOT_NAMES.get(root_key, root_key.title())
+        for sub_key, sub_data in root_data.get("categories", {}).items():
+            # One entry per subcategory, shared by all of its verbs (read-only downstream)
+            entry = {"root": root_label, "sub": sub_key.replace("_", " ").title()}
+            for base, val in sub_data.get("verbs", {}).items():
                 if isinstance(val, dict):
                     pron = val.get("form", "") or val.get("related_pronominal", "")
                 else:
                     pron = val
-                
                 if base:
-                    mapping[base.lower()] = {"root": root_label, "sub": sub_label}
+                    yield base.lower(), entry
                 if pron:
-                    mapping[pron.lower()] = {"root": root_label, "sub": sub_label}
-                    
-    return mapping
+                    yield pron.lower(), entry
+
+
+@st.cache_resource(show_spinner=False)
+def get_taxonomy_map(json_path: str = VERBS_CAT_JSON) -> Dict[str, Dict[str, str]]:
+    taxonomy = load_se_catalog(json_path).get("verb_taxonomy", {})
+    return dict(_iter_taxonomy_pairs(taxonomy))
+
+class VerbSeeds(NamedTuple):
+    """Taxonomy seeds: lowercased base verb -> se-form per root, plus the experiencer base verbs."""
+    reflexive: Dict[str, str]
+    pronominal: Dict[str, str]
+    accidental: Dict[str, str]
+    experiencer: List[str]
+
 
 @st.cache_data(show_spinner=False)
-def load_verb_seeds(json_path: str = VERBS_CAT_JSON) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str], List[str]]:
+def load_verb_seeds(json_path: str = VERBS_CAT_JSON) -> VerbSeeds:
     data = load_se_catalog(json_path)
     taxonomy = data.get("verb_taxonomy", {})
-    
-    def _flatten_categories(root_key: str) -> Dict[str, str]:
-        flat_map = {}
-        cats = taxonomy.get(root_key, {}).get("categories", {})
-        for cat_name, content in cats.items():
+
+    reflexive_flat, pronominal_flat, accidental_flat = {}, {}, {}
+    experiencer_set = set()
+    flat_by_root = {"reflexive": reflexive_flat, "pronominal": pronominal_flat, "accidental_dative": accidental_flat}
+
+    # One walk over the taxonomy, dispatching each root to its target
+    for root_key, root_data in taxonomy.items():
+        flat_map = flat_by_root.get(root_key)
+        if flat_map is None and root_key != "experiencer":
+            continue
+        for content in root_data.get("categories", {}).values():
             for base, val in content.get("verbs", {}).items():
-                if isinstance(val, dict):
-                    pron = val.get("form", "")
-                else:
-                    pron = val
+                if flat_map is None:
+                    experiencer_set.add(base.lower())
+                    continue
+                pron = val.get("form", "") if isinstance(val, dict) else val
                 if pron:
                     flat_map[base.lower()] = pron
-        return flat_map
 
-    reflexive_flat = _flatten_categories("reflexive")
-    pronominal_flat = _flatten_categories("pronominal")
-    accidental_flat = _flatten_categories("accidental_dative")
-    
-    experiencer_set = set()
-    exp_cats = taxonomy.get("experiencer", {}).get("categories", {})
-    for _, content in exp_cats.items():
-        for base in content.get("verbs", {}).keys():
-            experiencer_set.add(base.lower())
-    
-    return reflexive_flat, pronominal_flat, accidental_flat, list(experiencer_set)
+    return VerbSeeds(reflexive_flat, pronominal_flat, accidental_flat, list(experiencer_set))
 
-@st.cache_data(show_spinner=False)
-def load_templates(json_path: str = VERBS_CAT_JSON) -> Dict[str, dict]:
+@st.cache_resource(show_spinner=False)
+def load_templates(json_path: str = VERBS_CAT_JSON) -> Tuple[Mapping[str, dict], Optional[dict]]:
+    """Return (templates, reference_guide) from a single parse of the catalog JSON; templates are read-only."""
     data = load_se_catalog(json_path)
     raw_templates = data.get("templates", {})
     processed = {}
     for key, val in raw_templates.items():
+        prompt = "\n".join(val.get("prompt", [])) if isinstance(val.get("prompt"), list) else val.get("prompt", "")
         processed[key] = {
             "name": val.get("name", key),
-            "prompt": "\n".join(val.get("prompt", [])) if isinstance(val.get("prompt"), list) else val.get("prompt", "")
+            "prompt": prompt,
+            "segments": _compile_prompt(prompt),
         }
-    return processed
+    return MappingProxyType(processed), data.get("reference_guide")
 
 
-def classify_se_type(infinitive: str, pronominal_infinitive: str | None, se_catalog: dict) -> str | None:
-    inf = infinitive.lower()
-    taxonomy = se_catalog.get("verb_taxonomy", {})
-    
-    def _get_set(root_key, use_values=True):
-        s = set()
-        cats = taxonomy.get(root_key, {}).get("categories", {})
-        for _, content in cats.items():
-            for val in content.get("verbs", {}).values():
-                if isinstance(val, dict):
-                    target = val.get("form", "") if use_values else val
-                else:
-                    target = val
-                if use_values:
-                    s.add(target.lower())
-            if not use_values:
-                for k in content.get("verbs", {}).keys():
-                    s.add(k.lower())
-        return s
-
-    exp_all = _get_set("experiencer", use_values=False)
-    if inf in exp_all:
+def _compile_prompt(prompt: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    """
+    Pre-parse a prompt's format string into (literal, field) segments so rendering is a join.
+    Returns None when a field uses a conversion/format spec or an index; those keep using str.format.
+    """
+    try:
+        parsed = list(Formatter().parse(prompt))
+    except ValueError:
+        return None
+    segments = []
+    for literal, name, spec, conversion in parsed:
+        if name is not None and (spec or conversion or not name.isidentifier()):
+            return None
+        segments.append((literal, name))
+    return tuple(segments)
+
+
+@st.cache_resource(show_spinner=False)
+def get_se_form_types(json_path: str = VERBS_CAT_JSON) -> Dict[str, str]:
+    """Pronominal form -> se_type, fused into one dict; on overlap accidental beats reflexive beats pronominal."""
+    taxonomy = load_se_catalog(json_path).get("verb_taxonomy", {})
+    # Lowest precedence first, so later (higher-precedence) roots overwrite on overlap
+    return {
+        (val.get("form", "") if isinstance(val, dict) else val).lower(): se_type
+        for se_type in ("pronominal", "reflexive", "accidental_dative")
+        for content in taxonomy.get(se_type, {}).get("categories", {}).values()
+        for val in content.get("verbs", {}).values()
+    }
+
+
+@dataclass(frozen=True)
+class VerbContext:
+    """Catalog data merge_usage/render_prompt need, resolved once instead of re-probing caches per verb."""
+    reflexive_flat: Dict[str, str]
+    pronominal_flat: Dict[str, str]
+    accidental_flat: Dict[str, str]
+    experiencer_set: frozenset
+    se_form_types: Dict[str, str]
+    templates: Mapping[str, dict]
+    seed_usage: Mapping[str, dict] = field(default_factory=dict)
+
+
+@st.cache_resource(show_spinner=False)
+def build_verb_context(json_path: str = VERBS_CAT_JSON) -> VerbContext:
+    seeds = load_verb_seeds(json_path)
+    templates, _ = load_templates(json_path)
+    ctx = VerbContext(
+        reflexive_flat=seeds.reflexive,
+        pronominal_flat=seeds.pronominal,
+        accidental_flat=seeds.accidental,
+        experiencer_set=frozenset(seeds.experiencer),
+        se_form_types=get_se_form_types(json_path),
+        templates=templates,
+    )
+    # Usage for every seeded verb without an override, resolved once
+    seeded = set(ctx.reflexive_flat) | set(ctx.pronominal_flat) | ctx.experiencer_set
+    return replace(ctx, seed_usage=MappingProxyType({base: _resolve_usage(base, {}, ctx) for base in seeded}))
+
+
+def classify_se_type(infinitive: str, pronominal_infinitive: str | None, ctx: VerbContext) -> str | None:
+    if infinitive.lower() in ctx.experiencer_set:
         return "experiencer"
 
     if not pronominal_infinitive:
         return None
 
-    pro = pronominal_infinitive.lower()
-    acc_all = _get_set("accidental_dative", use_values=True)
-    ref_all = _get_set("reflexive", use_values=True)
-    pro_all = _get_set("pronominal", use_values=True)
-
-    if pro in acc_all:
-        return "accidental_dative"
-    if pro in ref_all:
-        return "reflexive"
-    if pro in pro_all:
-        return "pronominal"
-    
-    return None
+    return ctx.se_form_types.get(pronominal_infinitive.lower())
 
 
-def _starter_overrides() -> Dict[str, dict]:
-    return {
-        "lavar": {"is_pronominal": True, "pronominal_infinitive": "lavarse", "se_type": "reflexive", "meaning_shift": "subject washes self"},
-        "ir": {"is_pronominal": True, "pronominal_infinitive": "irse", "se_type": "pronominal", "meaning_shift": "departure / leaving"},
-        "caer": {"is_pronominal": True, "pronominal_infinitive": "caerse", "se_type": "accidental_dative", "meaning_shift": "fall/drop accidentally"},
-        "gustar": {"is_pronominal": False, "se_type": "experiencer", "meaning_shift": "pleases (inverted subject)"}
-    }
+_STARTER_OVERRIDES: Mapping[str, dict] = MappingProxyType({
+    "lavar": {"is_pronominal": True, "pronominal_infinitive": "lavarse", "se_type": "reflexive", "meaning_shift": "subject washes self"},
+    "ir": {"is_pronominal": True, "pronominal_infinitive": "irse", "se_type": "pronominal", "meaning_shift": "departure / leaving"},
+    "caer": {"is_pronominal": True, "pronominal_infinitive": "caerse", "se_type": "accidental_dative", "meaning_shift": "fall/drop accidentally"},
+    "gustar": {"is_pronominal": False, "se_type": "experiencer", "meaning_shift": "pleases (inverted subject)"}
+})
+_STARTER_KEYS = frozenset(_STARTER_OVERRIDES)
+
+
+def get_overrides_version(overrides_path: str) -> int:
+    """Change token for the overrides file (its mtime), used to key per-verb caches."""
+    p = Path(overrides_path)
+    return p.stat().st_mtime_ns if p.exists() else 0
 
 
-def load_overrides(overrides_path: str) -> Dict[str, dict]:
-    starter = _starter_overrides()
+@st.cache_data(show_spinner=False)
+def load_overrides(overrides_path: str, version: int = 0) -> Dict[str, dict]:
+    """Starter overrides merged with the user file; pass get_overrides_version() as version to pick up edits."""
+    starter = dict(_STARTER_OVERRIDES)
     p = Path(overrides_path)
     if not p.exists():
         return starter
     try:
-        with open(p, "r", encoding="utf-8") as f:
-            user_overrides = json.load(f)
+        user_overrides = _read_json(p)
         if not isinstance(user_overrides, dict):
             return starter
         merged = dict(starter)
@@ -174,22 +262,22 @@ def load_overrides(overrides_path: str) -> Dict[str, dict]:
 
 
 def save_overrides(overrides_path: str, merged_overrides: Dict[str, dict]) -> None:
-    starter_keys = set(_starter_overrides().keys())
-    user_only = {k: v for k, v in merged_overrides.items() if k not in starter_keys}
-    with open(overrides_path, "w", encoding="utf-8") as f:
-        json.dump(user_only, f, ensure_ascii=False, indent=2)
+    user_only = {k: v for k, v in merged_overrides.items() if k not in _STARTER_KEYS}
+    Path(overrides_path).write_text(_dumps(user_only), encoding="utf-8")
 
 
-@st.cache_data(show_spinner=False)
+@st.cache_resource(show_spinner=False)
 def load_frequency_map(freq_path: str) -> Dict[str, int]:
     p = Path(freq_path)
     if not p.exists():
         return {}
     try:
-        with open(p, "r", encoding="utf-8") as f:
-            m = json.load(f)
+        m = _read_json(p)
         if not isinstance(m, dict):
             return {}
+        # JSON object keys are always str; the usual file is all-int ranks, so skip per-item coercion
+        if all(type(v) is int for v in m.values()):
+            return {k.lower(): v for k, v in m.items()}
         out = {}
         for k, v in m.items():
             try:
@@ -206,21 +294,32 @@ def get_verb_record(verbs: List[dict], lookup: Dict[str, int], infinitive: str)
     return verbs[idx] if idx is not None else None
 
 
-def merge_usage(verb: dict, overrides: Dict[str, dict]) -> dict:
-    base = (verb.get("infinitive") or "").lower()
-    o = overrides.get(base, {})
-    ref_seed, pron_seed, acc_seed, exp_seed_list = load_verb_seeds(VERBS_CAT_JSON)
-    se_catalog = load_se_catalog(VERBS_CAT_JSON)
-    
-    seed_pron = pron_seed.get(base)
-    seed_refl = ref_seed.get(base)
+def get_merged_verb(infinitive: str, verbs: List[dict], lookup: Dict[str, int],
+                    overrides: Dict[str, dict], ctx: VerbContext) -> Optional[dict]:
+    """get_verb_record + merge_usage in one call; None if the verb is unknown."""
+    v = get_verb_record(verbs, lookup, infinitive)
+    return merge_usage(v, overrides, ctx) if v else None
+
+
+_DEFAULT_USAGE: Mapping[str, Any] = MappingProxyType({
+    "is_pronominal": False,
+    "pronominal_infinitive": None,
+    "se_type": None,
+    "meaning_shift": None,
+    "notes": "",
+})
 
+
+def _resolve_usage(base: str, o: dict, ctx: VerbContext) -> dict:
+    """Usage block for a lowercased base verb from its override entry (may be empty) and the seeds."""
     is_pronominal = bool(o.get("is_pronominal", False))
     pronominal_inf = o.get("pronominal_infinitive")
     se_type = o.get("se_type")
     meaning_shift = o.get("meaning_shift")
 
     if not o:
+        seed_pron = ctx.pronominal_flat.get(base)
+        seed_refl = ctx.reflexive_flat.get(base)
         if seed_pron:
             is_pronominal = True
             pronominal_inf = seed_pron
@@ -230,17 +329,14 @@ def merge_usage(verb: dict, overrides: Dict[str, dict]) -> dict:
             pronominal_inf = seed_refl
             meaning_shift = "reflexive (self-directed)"
     
-    if is_pronominal and pronominal_inf:
-        computed_type = classify_se_type(base, pronominal_inf, se_catalog)
-        if computed_type:
-            se_type = computed_type 
-            if se_type == "experiencer":
-                meaning_shift = "Psychological/Experiencer (IO construction)"
-    elif classify_se_type(base, None, se_catalog) == "experiencer":
+    # Same precedence as classify_se_type: experiencer (by base verb) wins over the se-form lookup
+    if base in ctx.experiencer_set:
         se_type = "experiencer"
         meaning_shift = "Psychological/Experiencer (IO construction)"
+    elif is_pronominal and pronominal_inf:
+        se_type = ctx.se_form_types.get(pronominal_inf.lower()) or se_type
 
-    usage = {
+    return {
         "is_pronominal": is_pronominal,
         "pronominal_infinitive": pronominal_inf,
         "se_type": se_type, 
@@ -248,6 +344,13 @@ def merge_usage(verb: dict, overrides: Dict[str, dict]) -> dict:
         "notes": o.get("notes", "")
     }
 
+
+def merge_usage(verb: dict, overrides: Dict[str, dict], ctx: VerbContext) -> dict:
+    base = verb.get("_inf_lc") or (verb.get("infinitive") or "").lower()
+    o = overrides.get(base)
+    # Without an override the usage depends only on the catalog, so it comes from the precomputed table
+    usage = _resolve_usage(base, o, ctx) if o else dict(ctx.seed_usage.get(base, _DEFAULT_USAGE))
+
     verb2 = dict(verb)
     verb2["usage"] = usage
     if "infinitive_english" in verb2 and "gloss_en" not in verb2:
@@ -255,16 +358,8 @@ def merge_usage(verb: dict, overrides: Dict[str, dict]) -> dict:
     return verb2
 
 
-def render_prompt(template_id: str, verb: dict) -> str:
-    templates = load_templates(VERBS_CAT_JSON)
-    t = templates.get(template_id)
-    if not t:
-        return ""
-    usage = verb.get("usage", {}) or {}
-    
-    raw_infinitive = verb.get("infinitive", "VERB")
-    usage_pron = usage.get("pronominal_infinitive")
-    
+def _resolve_prompt_fields(raw_infinitive: str, usage_pron: str | None) -> Tuple[str, str]:
+    """(base_infinitive, pronominal) placeholders for a verb."""
     # ----------------------------------------------------
     # SMART LOGIC: Handle "hacerse" -> "hacer" vs "hacerse"
     # ----------------------------------------------------
@@ -284,45 +379,143 @@ def render_prompt(template_id: str, verb: dict) -> str:
         else:
             base_infinitive = raw_infinitive
             pronominal = f"{raw_infinitive}se"
-            
+    return base_infinitive, pronominal
+
+
+def _format_prompt(t: dict, base_infinitive: str, pronominal: str, shift: str) -> str:
+    """Render a template from its pre-parsed segments (str.format only when it could not be pre-parsed)."""
+    fields = {
+        "infinitive": base_infinitive, # Passes 'hacer' even if 'hacerse' was clicked
+        "pronominal_infinitive": pronominal, # Passes 'hacerse'
+        "meaning_shift": shift,
+    }
+    segments = t.get("segments")
+    if segments is None:
+        return t["prompt"].format(**fields)
+    return "".join(literal + (str(fields[name]) if name is not None else "") for literal, name in segments)
+
+
+def render_prompt(template_id: str, verb: dict, ctx: VerbContext) -> str:
+    t = ctx.templates.get(template_id)
+    if not t:
+        return ""
+    usage = verb.get("usage", {}) or {}
+    base_infinitive, pronominal = _resolve_prompt_fields(verb.get("infinitive", "VERB"), usage.get("pronominal_infinitive"))
     shift = usage.get("meaning_shift") or "Standard usage"
+    return _format_prompt(t, base_infinitive, pronominal, shift)
+
+
+def _inf_lc(v: dict) -> str:
+    """Lowercased infinitive; precomputed by load_jehle_db, derived for records from elsewhere."""
+    lc = v.get("_inf_lc")
+    return lc if lc is not None else (v.get("infinitive") or "").lower()
+
+
+def _build_search_index(verbs: List[dict]) -> Tuple[List[str], List[int]]:
+    """Lowercased infinitives in sorted order plus their positions in verbs, for bisect prefix lookups."""
+    pairs = sorted((_inf_lc(v), i) for i, v in enumerate(verbs))
+    return [p[0] for p in pairs], [p[1] for p in pairs]
+
+
+def _build_english_index(verbs: List[dict]) -> Tuple[str, List[int]]:
+    """
+    Every verb's lowercased English (gloss + per-conjugation glosses) joined into one NUL-separated
+    corpus, plus the offset where each verb's text starts. Substring search becomes str.find over
+    one string instead of a Python loop over every conjugation of every verb.
+    """
+    parts = []
+    starts = []
+    pos = 0
+    for v in verbs:
+        texts = [v.get("infinitive_english") or v.get("gloss_en") or ""]
+        texts.extend(c.get("verb_english") or "" for c in (v.get("conjugations") or []))
+        blob = "\0".join(t.lower() for t in texts)
+        starts.append(pos)
+        parts.append(blob)
+        pos += len(blob) + 1
+    return "\0".join(parts), starts
+
 
-    return t["prompt"].format(
-        infinitive=base_infinitive, # Passes 'hacer' even if 'hacerse' was clicked
-        pronominal_infinitive=pronominal, # Passes 'hacerse'
-        meaning_shift=shift,
+# Two-letter infinitive ending -> ar/er/ir bucket (anything else, e.g. -se, is "other")
+_ENDING_BUCKETS = {"ar": "ar", "er": "er", "ir": "ir", "ír": "ir"}
+
+
+class DbIndexes(NamedTuple):
+    """
+    Lookup structures for one verb DB: the prefix search index, the English corpus, infinitive ->
+    lowercase form, infinitive -> ar/er/ir/other bucket, every infinitive in DB order, and every
+    infinitive in frequency-rank order.
+    """
+    search_index: Tuple[List[str], List[int]]
+    english_index: Tuple[str, List[int]]
+    lower_map: Dict[str, str]
+    endings: Dict[str, str]
+    infinitives: Tuple[str, ...]
+    popularity: Tuple[str, ...]
+
+
+@st.cache_resource(show_spinner=False)
+def get_db_indexes(db_json_path: str, lookup_json_path: str, freq_path: str) -> DbIndexes:
+    """Build every DbIndexes field once per process from the verbs list load_jehle_db returns for these paths."""
+    verbs, _ = load_jehle_db(db_json_path, lookup_json_path)
+    records = [v for v in verbs if v.get("infinitive")]
+    lower_map = {v["infinitive"]: _inf_lc(v) for v in records}
+    return DbIndexes(
+        search_index=_build_search_index(verbs),
+        english_index=_build_english_index(verbs),
+        lower_map=lower_map,
+        endings={inf: _ENDING_BUCKETS.get(low[-2:], "other") for inf, low in lower_map.items()},
+        infinitives=tuple(v["infinitive"] for v in records),
+        popularity=tuple(sorted_infinitives(records, load_frequency_map(freq_path))),
     )
 
 
-def _matches_english(v: dict, q: str) -> bool:
-    gloss = (v.get("infinitive_english") or v.get("gloss_en") or "")
-    if gloss and q in gloss.lower():
-        return True
-    for c in (v.get("conjugations") or []):
-        ve = (c.get("verb_english") or "")
-        if ve and q in ve.lower():
-            return True
-    return False
+def _prefix_hits(search_index: Tuple[List[str], List[int]], q: str) -> set:
+    keys, positions = search_index
+    lo = bisect_left(keys, q)
+    hi = bisect_left(keys, q + "\uffff", lo)
+    return set(positions[lo:hi])
+
+
+def _english_hits(english_index: Tuple[str, List[int]], q: str) -> set:
+    """Positions of verbs whose English text contains q (same semantics as a per-string `q in text`)."""
+    if "\0" in q:
+        return set()
+    corpus, starts = english_index
+    hits = set()
+    i = corpus.find(q)
+    while i != -1:
+        idx = bisect_right(starts, i) - 1
+        hits.add(idx)
+        # One hit per verb is enough: resume the scan at the next verb's text
+        if idx + 1 >= len(starts):
+            break
+        i = corpus.find(q, starts[idx + 1])
+    return hits
 
 
-def search_verbs(verbs: List[dict], query: str, limit: int = 2000) -> List[dict]:
+def search_verbs(verbs: List[dict], query: str, limit: int = 2000, indexes: Optional[DbIndexes] = None) -> List[dict]:
+    """Pass get_db_indexes() for the DB verbs came from to reuse its indexes; without it they are built per call."""
     q = (query or "").strip().lower()
     if not q:
         return []
-    out = []
-    for v in verbs:
-        inf = (v.get("infinitive") or "")
-        if inf.lower().startswith(q) or _matches_english(v, q):
-            out.append(v)
-        if len(out) >= limit:
-            break
-    return out
+    if indexes is None:
+        search_index, english_index = _build_search_index(verbs), _build_english_index(verbs)
+    else:
+        search_index, english_index = indexes.search_index, indexes.english_index
+    hits = _prefix_hits(search_index, q) | _english_hits(english_index, q)
+    return [verbs[i] for i in sorted(hits)[:limit]]
 
 
 def sorted_infinitives(verbs: List[dict], rank_map: Dict[str, int]) -> List[str]:
-    infinitives = [v.get("infinitive") for v in verbs if v.get("infinitive")]
-    infinitives.sort(key=lambda inf: (rank_map.get(inf.lower(), 10_000_000), inf))
-    return infinitives
+    records = [v for v in verbs if v.get("infinitive")]
+    infinitives = [v["infinitive"] for v in records]
+    ranks = np.fromiter(
+        (rank_map.get(_inf_lc(v), 10_000_000) for v in records), dtype=np.int32, count=len(records)
+    )
+    # Sort by rank, ties broken by infinitive -- entirely inside NumPy
+    order = np.lexsort((np.array(infinitives), ranks))
+    return [infinitives[i] for i in order]
 
 # ==========================================
 # BROWSER-BASED USER DATA (for Streamlit Cloud)
@@ -343,43 +536,65 @@ def get_default_user_data() -> dict:
 def init_user_data_in_session() -> dict:
     """
     Initialize user data in session state.
-    For Streamlit Cloud: data lives only in session state (browser session)
+    For Streamlit Cloud: data lives only in session state (browser session).
+    The returned dict is the session's own object, so mutators edit it in place.
     """
     if "user_data" not in st.session_state:
         st.session_state["user_data"] = get_default_user_data()
+    if "_favourites_set" not in st.session_state:
+        _sync_favourites_set(st.session_state["user_data"])
     return st.session_state["user_data"]
 
 
+def _sync_favourites_set(user_data: dict) -> None:
+    """Rebuild the O(1) lookup set that mirrors user_data["favourites"]"""
+    st.session_state["_favourites_set"] = set(user_data.get("favourites", []))
+
+
+def get_favourites_set() -> set:
+    """Return the set of favourite infinitives (for per-tile membership tests)"""
+    if "_favourites_set" not in st.session_state:
+        _sync_favourites_set(st.session_state.get("user_data", {}))
+    return st.session_state["_favourites_set"]
+
+
 def toggle_favourite(infinitive: str) -> dict:
     """
     Add or remove a verb from favourites in session state.
     Returns updated user_data dict.
     """
-    user_data = st.session_state.get("user_data", get_default_user_data())
-    favourites = user_data.get("favourites", [])
+    user_data = init_user_data_in_session()
+    favourites = user_data.setdefault("favourites", [])
+    fav_set = get_favourites_set()
     
-    if infinitive in favourites:
+    # Membership goes through the set mirror; it is updated in place rather than rebuilt
+    if infinitive in fav_set:
         favourites.remove(infinitive)
+        fav_set.discard(infinitive)
     else:
         favourites.append(infinitive)
-    
-    user_data["favourites"] = favourites
-    user_data["last_updated"] = datetime.now().isoformat()
-    st.session_state["user_data"] = user_data
+        fav_set.add(infinitive)
     return user_data
 
 
 def is_favourite(infinitive: str) -> bool:
     """Check if a verb is in favourites"""
-    user_data = st.session_state.get("user_data", {})
-    return infinitive in user_data.get("favourites", [])
+    return infinitive in get_favourites_set()
 
 
-def export_user_data_json() -> str:
-    """Export user data as JSON string for download"""
+def clear_favourites() -> dict:
+    """Remove all favourites from session state"""
+    user_data = init_user_data_in_session()
+    user_data["favourites"] = []
+    get_favourites_set().clear()
+    return user_data
+
+
+def export_user_data_json(compact: bool = True) -> str:
+    """Export user data as JSON string for download (last_updated is stamped here, not on every edit)"""
     user_data = st.session_state.get("user_data", get_default_user_data())
     user_data["last_updated"] = datetime.now().isoformat()
-    return json.dumps(user_data, ensure_ascii=False, indent=2)
+    return _dumps(user_data, compact=compact)
 
 
 def import_user_data_from_json(json_str: str) -> bool:
@@ -388,7 +603,7 @@ def import_user_data_from_json(json_str: str) -> bool:
     Returns True if successful, False otherwise.
     """
     try:
-        data = json.loads(json_str)
+        data = _loads(json_str)
         
         # Validate structure
         if not isinstance(data, dict):
@@ -400,10 +615,13 @@ def import_user_data_from_json(json_str: str) -> bool:
             if key not in data:
                 data[key] = [] if key in ["favourites", "history"] else {}
         
+        # Duplicates would let the list and its lookup set drift apart on toggle
+        data["favourites"] = list(dict.fromkeys(data["favourites"]))
         data["version"] = data.get("version", 1)
         data["last_updated"] = datetime.now().isoformat()
         
         st.session_state["user_data"] = data
+        _sync_favourites_set(data)
         return True
         
     except json.JSONDecodeError:
@@ -417,13 +635,9 @@ def merge_favourites(new_favourites: list) -> dict:
     Merge new favourites with existing ones (no duplicates).
     Useful for importing favourites from GitHub without losing session data.
     """
-    user_data = st.session_state.get("user_data", get_default_user_data())
-    current_favs = set(user_data.get("favourites", []))
-    
-    for fav in new_favourites:
-        current_favs.add(fav)
+    user_data = init_user_data_in_session()
+    current_favs = get_favourites_set()
+    current_favs.update(new_favourites)
     
-    user_data["favourites"] = sorted(list(current_favs))
-    user_data["last_updated"] = datetime.now().isoformat()
-    st.session_state["user_data"] = user_data
+    user_data["favourites"] = sorted(current_favs)
     return user_data
\ No newline at end of file
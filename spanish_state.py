@@ -39,6 +39,11 @@ def click_tile(infinitive: str) -> None:
         st.toast(f"Previewing **{infinitive}**. Click again to open details.", icon="👀")
 
 
+def open_detail(infinitive: str) -> None:
+    st.session_state["selected"] = infinitive
+    st.session_state["mode"] = "detail"
+
+
 def back_to_grid() -> None:
     st.session_state["mode"] = "grid"
     st.session_state["selected"] = None
\ No newline at end of file
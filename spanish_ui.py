@@ -5,9 +5,11 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import streamlit as st
+import streamlit.components.v1 as components
 
 
 # ---------- Display conventions ----------
@@ -220,11 +222,36 @@ def build_verb_card_html(verb: dict, rating: Optional[int] = None, freq_rank: Op
     """
 
 
+# ---------- Tile grid ----------
+# Static component (tile_grid/index.html): the whole grid is one widget instead of one st.button per tile.
+_tile_grid_component = components.declare_component(
+    "tile_grid", path=str(Path(__file__).parent / "tile_grid")
+)
+
+
+def render_tile_grid(tiles: List[Tuple[str, str]], selected: Optional[str], key: str, per_row: int = 6) -> Optional[str]:
+    """
+    Render (infinitive, label) tiles in a single component.
+    Returns the infinitive clicked since the last rerun, else None.
+    """
+    event = _tile_grid_component(tiles=tiles, selected=selected, per_row=per_row, key=key, default=None)
+    if not event:
+        return None
+    # The component keeps returning its last value, so only report each click once
+    nonce_key = f"_{key}_nonce"
+    if st.session_state.get(nonce_key) == event.get("nonce"):
+        return None
+    st.session_state[nonce_key] = event.get("nonce")
+    return event.get("inf")
+
+
 # ---------- Dashboard rendering ----------
-def _wide_table(title: str, col_titles: List[str], rows: List[List[str]]) -> None:
-    st.markdown(f"### {title}")
-    df = pd.DataFrame(rows, columns=["Pronoun"] + col_titles)
-    st.table(df)
+# A dashboard table: (heading, DataFrame). Built as plain data so it can be cached per verb.
+Table = Tuple[str, pd.DataFrame]
+
+
+def _wide_table(title: str, col_titles: List[str], rows: List[List[str]]) -> Table:
+    return title, pd.DataFrame(rows, columns=["Pronoun"] + col_titles)
 
 
 def _build_rows_for_tenses(
@@ -257,23 +284,40 @@ def _build_rows_for_tenses(
     return rows
 
 
-def render_conjugation_dashboard(verb: dict, show_vos: bool = True, show_vosotros: bool = True) -> None:
+def render_conjugation_dashboard(
+    verb: dict,
+    show_vos: bool = True,
+    show_vosotros: bool = True,
+    tables: Optional[List[Table]] = None,
+) -> None:
+    """Render the dashboard; pass precomputed (e.g. cached) tables to skip rebuilding them."""
     infinitive = verb.get("infinitive", "")
     st.markdown(f"## 🔹 Verb: **{infinitive.upper()}**")
     st.markdown("### Practice Conjugation Dashboard")
 
+    if tables is None:
+        tables = build_conjugation_tables(verb, show_vos, show_vosotros)
+    for title, df in tables:
+        st.markdown(f"### {title}")
+        st.table(df)
+
+
+def build_conjugation_tables(verb: dict, show_vos: bool = True, show_vosotros: bool = True) -> List[Table]:
+    infinitive = verb.get("infinitive", "")
+    tables: List[Table] = []
+
     # Participles
     nf = verb.get("nonfinite", {}) or {}
-    st.markdown("### 🧩 Participles")
-    st.table(
+    tables.append((
+        "🧩 Participles",
         pd.DataFrame(
             [
                 ["Present participle", nf.get("gerund", "")],
                 ["Past participle", nf.get("past_participle", "")],
             ],
             columns=["Type", "Form"],
-        )
-    )
+        ),
+    ))
 
     # --- INDICATIVE (simple) ---
     indic = _get_conj_map(verb, "Indicativo")
@@ -285,11 +329,11 @@ def render_conjugation_dashboard(verb: dict, show_vos: bool = True, show_vosotro
         show_vos=show_vos, 
         show_vosotros=show_vosotros
     )
-    _wide_table(
+    tables.append(_wide_table(
         f'Indicative of "{infinitive}"',
         ["Present", "Preterite", "Imperfect", "Conditional", "Future"],
         rows,
-    )
+    ))
 
     # --- SUBJUNCTIVE (simple) ---
     subj = _get_conj_map(verb, "Subjuntivo")
@@ -301,11 +345,11 @@ def render_conjugation_dashboard(verb: dict, show_vos: bool = True, show_vosotro
         show_vos=show_vos, 
         show_vosotros=show_vosotros
     )
-    _wide_table(
+    tables.append(_wide_table(
         f'Subjunctive of "{infinitive}"',
         ["Present", "Imperfect", "Future"],
         rows,
-    )
+    ))
 
     # --- IMPERATIVE (affirm/neg) ---
     imp_aff = _get_conj_map(verb, "Imperativo Afirmativo")
@@ -335,19 +379,20 @@ def render_conjugation_dashboard(verb: dict, show_vos: bool = True, show_vosotro
     
     rows.append(["Uds.", aff_forms.get("ellos/ellas/ustedes", ""), neg_wrap(neg_forms.get("ellos/ellas/ustedes", ""))])
 
-    _wide_table(f'Imperative of "{infinitive}"', ["Affirmative", "Negative"], rows)
+    tables.append(_wide_table(f'Imperative of "{infinitive}"', ["Affirmative", "Negative"], rows))
 
     # --- PROGRESSIVE ---
-    render_progressive_table(verb, show_vos, show_vosotros)
+    tables.append(build_progressive_table(verb, show_vos, show_vosotros))
 
     # --- PERFECT + PERFECT SUBJUNCTIVE ---
-    render_perfect_tables(verb, show_vos, show_vosotros)
+    tables.extend(build_perfect_tables(verb, show_vos, show_vosotros))
 
     # --- INFORMAL FUTURE ---
-    render_informal_future_table(verb, show_vos, show_vosotros)
+    tables.append(build_informal_future_table(verb, show_vos, show_vosotros))
+    return tables
 
 
-def render_progressive_table(verb: dict, show_vos: bool = True, show_vosotros: bool = True) -> None:
+def build_progressive_table(verb: dict, show_vos: bool = True, show_vosotros: bool = True) -> Table:
     infinitive = verb.get("infinitive", "")
     ger = (verb.get("nonfinite", {}) or {}).get("gerund", "")
     tenses = ["Present", "Preterite", "Imperfect", "Conditional", "Future"]
@@ -360,11 +405,12 @@ def render_progressive_table(verb: dict, show_vos: bool = True, show_vosotros: b
         aux = [AUX["estar"][t][i] for t in tenses]
         rows.append([label] + [f"{aux[j]} {ger}".strip() for j in range(len(tenses))])
 
-    _wide_table(f'Progressive of "{infinitive}"', tenses, rows)
+    return _wide_table(f'Progressive of "{infinitive}"', tenses, rows)
 
 
-def render_perfect_tables(verb: dict, show_vos: bool = True, show_vosotros: bool = True) -> None:
+def build_perfect_tables(verb: dict, show_vos: bool = True, show_vosotros: bool = True) -> List[Table]:
     infinitive = verb.get("infinitive", "")
+    tables: List[Table] = []
     pp = (verb.get("nonfinite", {}) or {}).get("past_participle", "")
 
     # Prefer Jehle compound tenses if present
@@ -392,7 +438,7 @@ def render_perfect_tables(verb: dict, show_vos: bool = True, show_vosotros: bool
                 else:
                     row.append(forms.get(jehle_key or "", ""))
             rows.append(row)
-        _wide_table(f'Perfect of "{infinitive}"', col_titles, rows)
+        tables.append(_wide_table(f'Perfect of "{infinitive}"', col_titles, rows))
     else:
         tenses = ["Present", "Preterite", "Past", "Conditional", "Future"]
         rows = []
@@ -402,7 +448,7 @@ def render_perfect_tables(verb: dict, show_vos: bool = True, show_vosotros: bool
 
             aux = [AUX["haber"][t][i] for t in tenses]
             rows.append([label] + [f"{aux[j]} {pp}".strip() for j in range(len(tenses))])
-        _wide_table(f'Perfect of "{infinitive}"', tenses, rows)
+        tables.append(_wide_table(f'Perfect of "{infinitive}"', tenses, rows))
 
     # Perfect Subjunctive
     subj = _get_conj_map(verb, "Subjuntivo")
@@ -423,7 +469,7 @@ def render_perfect_tables(verb: dict, show_vos: bool = True, show_vosotros: bool
                 else:
                     row.append(forms.get(jehle_key or "", ""))
             rows.append(row)
-        _wide_table(f'Perfect Subjunctive of "{infinitive}"', col_titles, rows)
+        tables.append(_wide_table(f'Perfect Subjunctive of "{infinitive}"', col_titles, rows))
     else:
         tenses = ["Present", "Past", "Future"]
         rows = []
@@ -433,10 +479,11 @@ def render_perfect_tables(verb: dict, show_vos: bool = True, show_vosotros: bool
 
             aux = [AUX["haber_subj"][t][i] for t in tenses]
             rows.append([label] + [f"{aux[j]} {pp}".strip() for j in range(len(tenses))])
-        _wide_table(f'Perfect Subjunctive of "{infinitive}"', tenses, rows)
+        tables.append(_wide_table(f'Perfect Subjunctive of "{infinitive}"', tenses, rows))
+    return tables
 
 
-def render_informal_future_table(verb: dict, show_vos: bool = True, show_vosotros: bool = True) -> None:
+def build_informal_future_table(verb: dict, show_vos: bool = True, show_vosotros: bool = True) -> Table:
     infinitive = verb.get("infinitive", "")
     rows = []
     for i, (label, _) in enumerate(DISPLAY_PERSONS):
@@ -445,4 +492,4 @@ def render_informal_future_table(verb: dict, show_vos: bool = True, show_vosotro
 
         aux = AUX["ir"]["Informal Future"][i]
         rows.append([label, f"{aux} a {infinitive}"])
-    _wide_table(f'Informal Future of "{infinitive}"', ["Informal Future"], rows)
\ No newline at end of file
+    return _wide_table(f'Informal Future of "{infinitive}"', ["Informal Future"], rows)
\ No newline at end of file